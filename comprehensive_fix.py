@@ -2,37 +2,69 @@
 
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Precompiled pattern, matched only at literal 'export async function' anchors
+# found with str.find - never free-scanned over the whole file. Each piece is
+# bounded ([^>]+ can't cross '>', \s* only eats whitespace), so a failed match
+# gives up after the current function header instead of backtracking across
+# the buffer the way the old MULTILINE|DOTALL full-file sub could.
+_DOUBLED_TRY = re.compile(
+    r'export async function (\w+)\(request: NextRequest, props: \{ params: Promise<[^>]+> \}\)\s*const params = await props\.params;\s*try \{\s*try \{'
+)
+
+def fix_route_content(content, file_path):
+    """Pure content transform - no I/O, so it can slot into a shared pipeline."""
+    # Remove orphaned closing braces from interface removal - these are
+    # always a bare '}' line followed by a blank line, so plain str.replace
+    # beats the old MULTILINE re.sub
+    while content.startswith('}\n\n'):
+        content = content[3:]
+    content = content.replace('\n}\n\n', '\n')
 
-def fix_route_file(file_path):
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
-    # Remove orphaned closing braces from interface removal
-    content = re.sub(r'^\s*}\s*$\n\n', '', content, flags=re.MULTILINE)
-    
     # Fix function signatures with params
     # Pattern: export async function METHOD(request, props: { params: Promise<{ id: string }> })
     # Should be: export async function METHOD(request, props: { params: Promise<{ id: string }> }) {
     #             const params = await props.params;
-    
+
     # Fix missing opening brace and duplicate try
-    content = re.sub(
-        r'export async function (\w+)\(request: NextRequest, props: \{ params: Promise<[^>]+> \}\)\s*const params = await props\.params;\s*try \{\s*try \{',
-        r'export async function \1(request: NextRequest, props: { params: Promise<{ id: string }> }) {\n  const params = await props.params;\n  try {',
-        content,
-        flags=re.MULTILINE | re.DOTALL
-    )
-    
-    # Handle applicationId case
-    if '[applicationId]' in file_path:
-        content = re.sub(
-            r'Promise<\{ id: string \}>',
-            r'Promise<{ id: string; applicationId: string }>',
-            content
+    # The pattern needs two literal 'try {' occurrences - check that cheaply first
+    if content.count('try {') >= 2:
+        pieces = []
+        cursor = 0
+        idx = content.find('export async function')
+        while idx != -1:
+            match = _DOUBLED_TRY.match(content, idx)
+            if match:
+                pieces.append(content[cursor:idx])
+                pieces.append(
+                    'export async function %s(request: NextRequest, props: { params: Promise<{ id: string }> }) {\n'
+                    '  const params = await props.params;\n'
+                    '  try {' % match.group(1)
+                )
+                cursor = match.end()
+                idx = content.find('export async function', match.end())
+            else:
+                idx = content.find('export async function', idx + 1)
+        if pieces:
+            pieces.append(content[cursor:])
+            content = ''.join(pieces)
+
+    # Handle applicationId case - fixed string rewrite, no regex needed
+    if '[applicationId]' in str(file_path):
+        content = content.replace(
+            'Promise<{ id: string }>',
+            'Promise<{ id: string; applicationId: string }>'
         )
-    
-    with open(file_path, 'w') as f:
-        f.write(content)
+
+    return content
+
+def fix_route_file(file_path):
+    file_path = Path(file_path)
+    content = file_path.read_text(encoding='utf-8')
+    content = fix_route_content(content, file_path)
+    file_path.write_text(content, encoding='utf-8')
 
 # List of files to fix
 files_to_fix = [
@@ -48,11 +80,21 @@ files_to_fix = [
     'src/app/api/users/[id]/route.ts'
 ]
 
-for file_path in files_to_fix:
-    if os.path.exists(file_path):
-        print(f"Fixing {file_path}")
-        fix_route_file(file_path)
+# Dedupe and resolve each path exactly once, keeping the original order
+unique_files = []
+for file_path in dict.fromkeys(files_to_fix):
+    resolved = Path(file_path)
+    if resolved.exists():
+        unique_files.append(resolved)
     else:
         print(f"File not found: {file_path}")
 
+def _fix_one(file_path):
+    print(f"Fixing {file_path}")
+    fix_route_file(file_path)
+
+# Small batch, so threads are enough to overlap the disk I/O
+with ThreadPoolExecutor() as executor:
+    list(executor.map(_fix_one, unique_files))
+
 print("All route files fixed!")
\ No newline at end of file
@@ -4,161 +4,133 @@ Comprehensive TypeScript Syntax Fixer
 Systematically fixes common syntax errors in TaskFi API routes
 """
 
+import bisect
 import os
 import re
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from fixer_utils import discover_ts_files, dumps_report
+
+_ORPHANED_CATCH = re.compile(r'^\s*\}\s*catch\s*\(\s*error\s*\)\s*\{', re.MULTILINE)
+_RETURN_NOSEMI = re.compile(r'(\s+return\s+NextResponse\.json\([^;]+)\)(\s*\n)')
+_STATUS_NOSEMI = re.compile(r'(\s*\},\s*\{\s*status:\s*\d+\s*\})(\s*\n)')
+_WALLET_SEMI = re.compile(r'walletBalance:\s*Math\.max\(0,\s*walletBalance\);')
+_MISSING_TRY = re.compile(r'(export async function \w+\([^)]*\)\s*\{)\s*(\n\s*if\s*\()')
+
+def _fix_file_worker(file_path):
+    """Process-pool worker: fix one file in a throwaway fixer.
+
+    Returns (changed, ok, fixes) - ok is False when fix_file errored, so the
+    parent never stamps a failed file into the stat cache.
+    """
+    fixer = TypeScriptSyntaxFixer(Path(file_path).parent)
+    changed = fixer.fix_file(file_path)
+    return changed is True, changed is not None, fixer.fixes_applied
+
 class TypeScriptSyntaxFixer:
     def __init__(self, base_path):
         self.base_path = Path(base_path)
         self.fixes_applied = []
+        self._cache_path = self.base_path / ".fixes_cache.json"
+        try:
+            self._stat_cache = json.loads(self._cache_path.read_text())
+        except (OSError, ValueError):
+            self._stat_cache = {}
     
-    def fix_missing_semicolons(self, content, file_path):
-        """Fix missing semicolons in return statements"""
-        fixes = []
-        
-        # Pattern: return NextResponse.json(...) without semicolon at end
-        pattern = r'(\s+return\s+NextResponse\.json\([^;]+)\)(\s*\n)'
-        def replace_semicolon(match):
-            before = match.group(1)
-            after = match.group(2)
-            fixes.append(f"Added semicolon to return statement")
-            return f"{before});{after}"
-        
-        content = re.sub(pattern, replace_semicolon, content, flags=re.MULTILINE)
-        
-        # Pattern: }, { status: XXX }) without semicolon
-        pattern2 = r'(\s*\},\s*\{\s*status:\s*\d+\s*\})(\s*\n)'
-        def replace_status_semicolon(match):
-            before = match.group(1)
-            after = match.group(2)
-            fixes.append(f"Added semicolon to status return")
-            return f"{before};{after}"
-        
-        content = re.sub(pattern2, replace_status_semicolon, content, flags=re.MULTILINE)
-        
-        # Pattern: walletBalance: Math.max(0, walletBalance); (fix incorrect semicolon)
-        content = re.sub(r'walletBalance:\s*Math\.max\(0,\s*walletBalance\);', 
-                        'walletBalance: Math.max(0, walletBalance),', content)
-        
-        if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-        
-        return content
-    
-    def fix_missing_function_braces(self, content, file_path):
-        """Fix missing closing braces for functions"""
-        lines = content.split('\n')
-        fixes = []
-        
-        # Track brace balance
-        brace_stack = []
-        function_starts = []
-        
-        for i, line in enumerate(lines):
-            # Find function declarations
-            if 'export async function' in line or 'async function' in line:
-                function_starts.append(i)
-            
-            # Count braces
-            open_braces = line.count('{')
-            close_braces = line.count('}')
-            
-            for _ in range(open_braces):
-                brace_stack.append(i)
-            
-            for _ in range(close_braces):
-                if brace_stack:
-                    brace_stack.pop()
-        
-        # If we have unmatched braces and function starts, add closing braces
-        if brace_stack and function_starts:
-            # Add missing closing braces at the end
-            missing_braces = len(brace_stack)
-            if missing_braces > 0:
-                lines.append('')
-                for _ in range(missing_braces):
-                    lines.append('}')
-                fixes.append(f"Added {missing_braces} missing closing braces")
-        
-        if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-        
-        return '\n'.join(lines)
-    
-    def fix_malformed_try_catch(self, content, file_path):
-        """Fix malformed try-catch blocks"""
-        fixes = []
-        lines = content.split('\n')
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            # Look for orphaned catch blocks
-            if re.match(r'\s*\}\s*catch\s*\(\s*error\s*\)\s*\{', line.strip()):
-                # Find the previous try block or add one
-                j = i - 1
-                found_try = False
-                
-                while j >= 0:
-                    if 'try {' in lines[j]:
-                        found_try = True
-                        break
-                    j -= 1
-                
-                if not found_try:
-                    # Insert a try block before this catch
-                    try_line = "  try {"
-                    lines.insert(i, try_line)
-                    fixes.append(f"Added missing try block at line {i+1}")
-                    i += 1  # Adjust index due to insertion
-            
-            i += 1
-        
-        if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-        
-        return '\n'.join(lines)
-    
-    def fix_incomplete_functions(self, content, file_path):
-        """Fix incomplete function declarations and structures"""
+    def fix_content(self, content, file_path):
+        """Apply all fixes to file content in one fused pipeline.
+
+        Runs the semicolon, try-catch, incomplete-function and brace-balance
+        rewrites back to back on the same buffer with a single shared fixes
+        list, instead of four separate passes each doing its own bookkeeping.
+        """
         fixes = []
-        
-        # Fix export function with missing try block
-        pattern = r'(export async function \w+\([^)]*\)\s*\{)\s*(\n\s*if\s*\()'
+
+        # Semicolon fixes only apply to files that return JSON or touch the
+        # wallet balance - skip all three subs for helpers that do neither
+        if 'return NextResponse.json' in content or 'walletBalance' in content:
+            # Missing semicolons in return statements
+            def replace_semicolon(match):
+                fixes.append("Added semicolon to return statement")
+                return f"{match.group(1)});{match.group(2)}"
+
+            content = _RETURN_NOSEMI.sub(replace_semicolon, content)
+
+            # }, { status: XXX }) without semicolon
+            def replace_status_semicolon(match):
+                fixes.append("Added semicolon to status return")
+                return f"{match.group(1)};{match.group(2)}"
+
+            content = _STATUS_NOSEMI.sub(replace_status_semicolon, content)
+
+            # walletBalance: Math.max(0, walletBalance); (fix incorrect semicolon)
+            content = _WALLET_SEMI.sub('walletBalance: Math.max(0, walletBalance),', content)
+
+        # Orphaned catch blocks: locate every existing try block once, then
+        # resolve each catch with a bisect lookup instead of re-scanning
+        if '} catch' in content:
+            try_positions = []
+            p = content.find('try {')
+            while p != -1:
+                try_positions.append(p)
+                p = content.find('try {', p + 1)
+
+            pieces = []
+            cursor = 0
+            for match in _ORPHANED_CATCH.finditer(content):
+                if bisect.bisect_left(try_positions, match.start()) == 0:
+                    # No try block anywhere above - insert one before this catch
+                    line_start = content.rfind('\n', 0, match.start()) + 1
+                    pieces.append(content[cursor:line_start])
+                    pieces.append("  try {\n")
+                    cursor = line_start
+                    bisect.insort(try_positions, line_start)
+                    line_no = content.count('\n', 0, line_start) + 1
+                    fixes.append(f"Added missing try block at line {line_no}")
+
+            if pieces:
+                pieces.append(content[cursor:])
+                content = ''.join(pieces)
+
+        # Export function with missing try block before an if statement
         def add_try_block(match):
-            func_start = match.group(1)
-            if_statement = match.group(2)
             fixes.append("Added missing try block after function declaration")
-            return f"{func_start}\n  try {{{if_statement}"
-        
-        content = re.sub(pattern, add_try_block, content, flags=re.MULTILINE)
-        
+            return f"{match.group(1)}\n  try {{{match.group(2)}"
+
+        content = _MISSING_TRY.sub(add_try_block, content)
+
+        # Brace balance: two C-level str.count calls over the whole buffer
+        if 'async function' in content:
+            missing_braces = content.count('{') - content.count('}')
+            if missing_braces > 0:
+                content += '\n' + '}\n' * missing_braces
+                fixes.append(f"Added {missing_braces} missing closing braces")
+
         if fixes:
             self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-        
+
         return content
-    
+
     def fix_file(self, file_path):
-        """Apply all fixes to a single file"""
+        """Apply all fixes to a single file.
+
+        Returns True when the file was rewritten, False when it was already
+        clean, and None when it could not be processed.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            
-            # Apply fixes in order
-            content = self.fix_missing_semicolons(content, file_path)
-            content = self.fix_malformed_try_catch(content, file_path)
-            content = self.fix_incomplete_functions(content, file_path)
-            content = self.fix_missing_function_braces(content, file_path)
+            content = Path(file_path).read_text(encoding='utf-8')
             
+            # str hashes are cached per object, so for untouched files this
+            # comparison is an O(1) int check instead of a full buffer walk
+            original_hash = hash(content)
+
+            content = self.fix_content(content, file_path)
+
             # Only write if changes were made
-            if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            if hash(content) != original_hash:
+                Path(file_path).write_text(content, encoding='utf-8')
                 print(f"✅ Fixed: {file_path}")
                 return True
             else:
@@ -167,8 +139,8 @@ class TypeScriptSyntaxFixer:
         
         except Exception as e:
             print(f"❌ Error fixing {file_path}: {e}")
-            return False
-    
+            return None
+
     def fix_all_api_routes(self):
         """Fix all API route files"""
         api_path = self.base_path / "src" / "app" / "api"
@@ -176,24 +148,50 @@ class TypeScriptSyntaxFixer:
             print(f"API path not found: {api_path}")
             return
         
-        # Get all TypeScript files in API routes
-        ts_files = list(api_path.rglob("*.ts"))
+        # Get all TypeScript files in API routes (manifest-cached walk)
+        ts_files = discover_ts_files(api_path)
         
         print(f"Found {len(ts_files)} TypeScript files in API routes")
         print("-" * 50)
         
-        fixed_count = 0
+        # Skip files whose mtime+size haven't moved since the last run -
+        # a stat is far cheaper than re-reading and re-scanning the file
+        pending = []
         for file_path in ts_files:
-            if self.fix_file(file_path):
-                fixed_count += 1
-        
+            st = os.stat(file_path)
+            if self._stat_cache.get(str(file_path)) == [st.st_mtime_ns, st.st_size]:
+                continue
+            pending.append(file_path)
+
+        if len(pending) < len(ts_files):
+            print(f"Skipping {len(ts_files) - len(pending)} unchanged files (stat cache)")
+
+        # Each file is an independent read-modify-write, so fan out across cores
+        fixed_count = 0
+        succeeded = []
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for file_path, (changed, ok, fixes) in zip(
+                    pending, executor.map(_fix_file_worker, pending, chunksize=8)):
+                if changed:
+                    fixed_count += 1
+                if ok:
+                    succeeded.append(file_path)
+                self.fixes_applied.extend(fixes)
+
+        # Record the post-fix stats so the next run can skip clean files.
+        # Only files that completed without error are stamped - a file whose
+        # fix errored must be retried on the next run, not cached as clean.
+        for file_path in succeeded:
+            st = os.stat(file_path)
+            self._stat_cache[str(file_path)] = [st.st_mtime_ns, st.st_size]
+        self._cache_path.write_text(json.dumps(self._stat_cache))
+
         print("-" * 50)
         print(f"Fixed {fixed_count} files out of {len(ts_files)}")
         
         # Save fix report
-        with open(self.base_path / "syntax_fixes_report.json", 'w') as f:
-            json.dump(self.fixes_applied, f, indent=2)
-        
+        (self.base_path / "syntax_fixes_report.json").write_bytes(dumps_report(self.fixes_applied))
+
         print(f"Fix report saved to: syntax_fixes_report.json")
 
 def main():
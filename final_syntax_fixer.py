@@ -3,22 +3,31 @@
 import os
 import re
 import glob
+from pathlib import Path
+
+# Precompiled patterns for the single-sub rewrites below
+_PAT_ORPHANED_CATCH = re.compile(r'(\s+})\s*} catch \(error\) \{')
+_PAT_DOUBLED_RETURN = re.compile(r'return NextResponse\.json\([^}]+}, return NextResponse\.json\([^}]+}, \{status: \d+\}\);')
+_PAT_RETURN_CATCH = re.compile(r'(\s+return NextResponse\.json\([^}]+}\);)\s*} catch \(error\) \{')
 
 def fix_typescript_syntax_issues(file_path):
     """Fix the specific TypeScript syntax issues identified."""
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
+    content = Path(file_path).read_text(encoding='utf-8')
     
     original_content = content
     fixed = False
     
     # Pattern 1: Fix orphaned catch blocks - find } catch and ensure they have proper try
     # Look for cases where there's a return statement followed by } catch
-    pattern1 = r'(\s+})\s*} catch \(error\) \{'
-    if re.search(pattern1, content):
-        content = re.sub(pattern1, r'\1\n  } catch (error) {', content)
-        fixed = True
+    # Cheap substring check first - most files have no catch block at all.
+    # re.sub returns the original str object when nothing matched, so one
+    # sub plus an identity check replaces the old search-then-sub double scan.
+    if '} catch (error) {' in content:
+        new_content = _PAT_ORPHANED_CATCH.sub(r'\1\n  } catch (error) {', content)
+        if new_content is not content:
+            content = new_content
+            fixed = True
     
     # Pattern 2: Fix orphaned try statements inside if blocks
     pattern2 = r'if \([^)]+\) \{\s*try \{\s*return NextResponse\.json'
@@ -43,20 +52,23 @@ def fix_typescript_syntax_issues(file_path):
     
     # If more than 2 consecutive closing braces at end, remove extras
     if extra_braces > 2:
-        # Keep only 1-2 closing braces
-        while lines and lines[-1].strip() == '}':
-            lines.pop()
-        
+        # Keep only 1-2 closing braces: find the cutoff with one reverse scan
+        # and slice, instead of popping (and re-stripping) one line at a time
+        i = len(lines) - 1
+        while i >= 0 and lines[i].strip() == '}':
+            i -= 1
+
         # Add back 1 closing brace for the function
-        lines.append('}')
+        lines = lines[:i + 1] + ['}']
         content = '\n'.join(lines)
         fixed = True
     
     # Pattern 4: Fix specific case of doubled return statements
-    pattern4 = r'return NextResponse\.json\([^}]+}, return NextResponse\.json\([^}]+}, \{status: \d+\}\);'
-    if re.search(pattern4, content):
-        content = re.sub(pattern4, lambda m: m.group(0).split(', return')[0] + ');', content)
-        fixed = True
+    if ', return NextResponse.json(' in content:
+        new_content = _PAT_DOUBLED_RETURN.sub(lambda m: m.group(0).split(', return')[0] + ');', content)
+        if new_content is not content:
+            content = new_content
+            fixed = True
     
     # Pattern 5: Fix missing closing braces in if statements
     # Look for return statements followed immediately by another statement without proper closure
@@ -70,14 +82,14 @@ def fix_typescript_syntax_issues(file_path):
     
     # Pattern 6: Fix malformed try-catch structure specific to API routes
     # Find: } catch (error) { immediately after return statements
-    pattern6 = r'(\s+return NextResponse\.json\([^}]+}\);)\s*} catch \(error\) \{'
-    if re.search(pattern6, content):
-        content = re.sub(pattern6, r'\1\n  } catch (error) {', content)
-        fixed = True
+    if '} catch (error) {' in content:
+        new_content = _PAT_RETURN_CATCH.sub(r'\1\n  } catch (error) {', content)
+        if new_content is not content:
+            content = new_content
+            fixed = True
     
     if fixed and content != original_content:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        Path(file_path).write_text(content, encoding='utf-8')
         return True
     
     return False
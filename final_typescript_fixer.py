@@ -4,9 +4,23 @@ Final TypeScript Error Fixer
 Addresses the remaining specific syntax patterns causing compilation errors
 """
 
+import bisect
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from fixer_utils import discover_ts_files, dumps_report
+
+_CATCH_LINE = re.compile(r'^\s*\}\s*catch\s*\(\s*error\s*\)\s*\{')
+_RETURN_SEMI_CATCH = re.compile(r'(\s+return\s+NextResponse\.json\([^;]+\))\s*\n(\s*\}\s*catch)')
+
+def _fix_file_worker(file_path):
+    """Process-pool worker: fix one file in a throwaway fixer and return its results."""
+    fixer = FinalTypeScriptFixer(Path(file_path).parent)
+    changed = fixer.fix_file(file_path)
+    return changed, fixer.fixes_applied
+
 class FinalTypeScriptFixer:
     def __init__(self, base_path):
         self.base_path = Path(base_path)
@@ -14,43 +28,49 @@ class FinalTypeScriptFixer:
     
     def fix_orphaned_catch_blocks(self, content, file_path):
         """Fix orphaned catch blocks by adding proper try structure"""
+        if '} catch' not in content:
+            return content
+
         fixes = []
         lines = content.split('\n')
         new_lines = []
-        
+
+        # Index function starts and brace lines once, so each orphaned catch
+        # resolves its enclosing function with a bisect lookup instead of
+        # walking every preceding line
+        func_start_idxs = [idx for idx, ln in enumerate(lines) if 'async function' in ln]
+        brace_idxs = [idx for idx, ln in enumerate(lines) if '{' in ln]
+
         i = 0
         while i < len(lines):
             line = lines[i]
-            
+
             # Look for } catch (error) { pattern
-            if re.search(r'^\s*\}\s*catch\s*\(\s*error\s*\)\s*\{', line):
-                # Need to add try block - look back for function start
-                j = i - 1
+            if _CATCH_LINE.search(line):
+                # Need to add try block - find the nearest enclosing function
                 function_found = False
-                brace_count = 0
-                
-                while j >= 0:
-                    if 'export async function' in lines[j] or 'async function' in lines[j]:
-                        # Find the opening brace of this function
-                        k = j
-                        while k <= i and '{' not in lines[k]:
-                            k += 1
-                        
-                        if k <= i:
-                            # Insert try block right after the function's opening brace
-                            func_brace_line = lines[k]
-                            indent = len(func_brace_line) - len(func_brace_line.lstrip())
-                            
-                            # Replace the function's opening brace line
-                            lines[k] = func_brace_line.replace('{', '{\n' + ' ' * (indent + 2) + 'try {')
-                            
-                            # Now fix the current catch line - add closing brace for try
-                            line = line.replace('} catch', '  } catch')
-                            fixes.append(f"Added try block for orphaned catch at line {i+1}")
-                            function_found = True
-                            break
-                    j -= 1
-                
+                pos = bisect.bisect_right(func_start_idxs, i - 1) - 1
+
+                while pos >= 0 and not function_found:
+                    j = func_start_idxs[pos]
+                    # First line at or after the function start containing '{'
+                    kb = bisect.bisect_left(brace_idxs, j)
+                    if kb < len(brace_idxs) and brace_idxs[kb] <= i:
+                        k = brace_idxs[kb]
+                        # Insert try block right after the function's opening brace
+                        func_brace_line = lines[k]
+                        indent = len(func_brace_line) - len(func_brace_line.lstrip())
+
+                        # Replace the function's opening brace line
+                        lines[k] = func_brace_line.replace('{', '{\n' + ' ' * (indent + 2) + 'try {')
+
+                        # Now fix the current catch line - add closing brace for try
+                        line = line.replace('} catch', '  } catch')
+                        fixes.append(f"Added try block for orphaned catch at line {i+1}")
+                        function_found = True
+                    else:
+                        pos -= 1
+
                 if not function_found:
                     # If we can't find function, just add try above
                     indent = len(line) - len(line.lstrip())
@@ -75,23 +95,19 @@ class FinalTypeScriptFixer:
     
     def fix_missing_return_statements(self, content, file_path):
         """Fix missing return statements in API handlers"""
-        fixes = []
-        
-        # Pattern: return NextResponse.json({ applications, stats }) without semicolon
-        content = re.sub(
-            r'(\s+return\s+NextResponse\.json\([^;]+\))\s*\n(\s*\}\s*catch)',
-            r'\1;\n\2',
-            content,
-            flags=re.MULTILINE
-        )
-        
-        # Pattern: return NextResponse.json({ escrow: escrowInfo }) without semicolon
-        if re.search(r'return\s+NextResponse\.json\([^;]+\)\s*\n\s*\}\s*catch', content):
-            fixes.append("Fixed missing semicolon in return statement")
-        
-        if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-        
+        # Pattern: return NextResponse.json({ applications, stats }) without
+        # semicolon before } catch. subn reports the replacement count from
+        # the same pass, so no second re.search over the buffer is needed.
+        if 'return NextResponse.json' not in content:
+            return content
+
+        content, n = _RETURN_SEMI_CATCH.subn(r'\1;\n\2', content)
+        if n:
+            self.fixes_applied.append({
+                "file": str(file_path),
+                "fixes": [f"Fixed {n} missing semicolons in return statements"]
+            })
+
         return content
     
     def fix_orphaned_braces(self, content, file_path):
@@ -127,48 +143,36 @@ class FinalTypeScriptFixer:
     
     def fix_missing_closing_braces(self, content, file_path):
         """Add missing closing braces for functions"""
-        fixes = []
-        lines = content.split('\n')
-        
-        # Simple brace counting
-        open_braces = 0
-        close_braces = 0
-        
-        for line in lines:
-            open_braces += line.count('{')
-            close_braces += line.count('}')
-        
-        # If we have more opening braces than closing, add closing braces
-        missing_braces = open_braces - close_braces
+        # Two str.count calls over the whole buffer - no split, no join,
+        # no per-line Python loop
+        missing_braces = content.count('{') - content.count('}')
         if missing_braces > 0:
-            for _ in range(missing_braces):
-                lines.append('}')
-            fixes.append(f"Added {missing_braces} missing closing braces")
-        
-        if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-            return '\n'.join(lines)
-        
+            content += '\n' + '}\n' * missing_braces
+            self.fixes_applied.append({
+                "file": str(file_path),
+                "fixes": [f"Added {missing_braces} missing closing braces"]
+            })
+
         return content
     
     def fix_file(self, file_path):
         """Apply all final fixes to a file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
+            content = Path(file_path).read_text(encoding='utf-8')
             
+            # str hashes are cached per object, so for untouched files this
+            # comparison is an O(1) int check instead of a full buffer walk
+            original_hash = hash(content)
+
             # Apply fixes in order
             content = self.fix_orphaned_catch_blocks(content, file_path)
             content = self.fix_missing_return_statements(content, file_path)
             content = self.fix_orphaned_braces(content, file_path)
             content = self.fix_missing_closing_braces(content, file_path)
-            
+
             # Write back if changed
-            if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            if hash(content) != original_hash:
+                Path(file_path).write_text(content, encoding='utf-8')
                 print(f"✅ Fixed: {file_path}")
                 return True
             else:
@@ -182,23 +186,24 @@ class FinalTypeScriptFixer:
     def fix_all_api_files(self):
         """Fix all API route files"""
         api_path = self.base_path / "src" / "app" / "api"
-        ts_files = list(api_path.rglob("*.ts"))
+        ts_files = discover_ts_files(api_path)
         
         print(f"Applying final fixes to {len(ts_files)} TypeScript files...")
         print("-" * 60)
         
+        # Files are independent, so process them across all cores
         fixed_count = 0
-        for file_path in ts_files:
-            if self.fix_file(file_path):
-                fixed_count += 1
-        
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for changed, fixes in executor.map(_fix_file_worker, ts_files, chunksize=8):
+                if changed:
+                    fixed_count += 1
+                self.fixes_applied.extend(fixes)
+
         print("-" * 60)
         print(f"Applied fixes to {fixed_count} files")
         
         # Save report
-        import json
-        with open(self.base_path / "final_fixes_report.json", 'w') as f:
-            json.dump(self.fixes_applied, f, indent=2)
+        (self.base_path / "final_fixes_report.json").write_bytes(dumps_report(self.fixes_applied))
 
 def main():
     base_path = "/project/workspace/alphaeth784/taskfi-dan"
@@ -6,83 +6,110 @@ Specifically targets the broken patterns created by the previous syntax fixer
 
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from fixer_utils import discover_ts_files
+
+# Precompiled patterns - compiled once instead of per call per file
+_DOUBLED_RETURN = re.compile(
+    r'return\s+NextResponse\.json\(\s*\{\s*error:\s*[\'"][^\'"]*[\'"]\s*\},\s*return\s+NextResponse\.json\(\s*\{\s*error:\s*[\'"][^\'"]*[\'"]\s*\},\s*\{\s*status:\s*\d+\s*\}\s*\)\s*;'
+)
+_STATUS_CODE = re.compile(r'status:\s*(\d+)')
+_INTERNAL_ERROR_LINE = re.compile(
+    r'^[^\n]*return NextResponse\.json\(\{ error: "Internal server error" \}[^\n]*$',
+    re.MULTILINE
+)
+_SAME_LINE_DOUBLE_RETURN = re.compile(
+    r'return\s+NextResponse\.json\([^)]+\)\s*;?\s*return\s+NextResponse\.json\([^)]+\)\s*;'
+)
+_SINGLE_RETURN = re.compile(r'return\s+NextResponse\.json\([^)]+\)\s*;')
+
 def fix_broken_return_statements(file_path):
     """Fix the specific malformed return statements created by previous script"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = Path(file_path).read_text(encoding='utf-8')
         
         original_content = content
         fixes = []
         
         # Pattern 1: return NextResponse.json(..., return NextResponse.json({...}, {status: XXX});
         # This should become: return NextResponse.json({...}, {status: XXX});
-        pattern1 = r'return\s+NextResponse\.json\(\s*\{\s*error:\s*[\'"][^\'"]*[\'"]\s*\},\s*return\s+NextResponse\.json\(\s*\{\s*error:\s*[\'"][^\'"]*[\'"]\s*\},\s*\{\s*status:\s*\d+\s*\}\s*\)\s*;'
-        
         def fix_doubled_return(match):
             # Extract status code
-            status_match = re.search(r'status:\s*(\d+)', match.group(0))
+            status_match = _STATUS_CODE.search(match.group(0))
             status = status_match.group(1) if status_match else '500'
             fixes.append(f"Fixed doubled return statement with status {status}")
             return f'return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});'
+
+        # Substring prefilter - skip the regex entirely for files that can't match
+        if 'return NextResponse.json' in content:
+            content = _DOUBLED_RETURN.sub(fix_doubled_return, content)
         
-        content = re.sub(pattern1, fix_doubled_return, content)
-        
-        # Pattern 2: Lines that are just "return NextResponse.json({ error: "..." }, { status: XXX });" 
-        # following incomplete return statements
-        lines = content.split('\n')
-        new_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            
-            # Check for malformed return pattern
-            if 'return NextResponse.json({ error: "Internal server error" }' in line and i > 0:
-                # Check if previous lines have incomplete return
-                prev_context = '\n'.join(lines[max(0, i-3):i])
-                
-                if 'return NextResponse.json(' in prev_context and '{ error:' in prev_context:
-                    # This is likely a malformed continuation - replace previous incomplete return
-                    j = i - 1
-                    while j >= 0 and 'return NextResponse.json(' not in lines[j]:
-                        j -= 1
-                    
-                    if j >= 0:
-                        # Extract status from current line
-                        status_match = re.search(r'status:\s*(\d+)', line)
-                        status = status_match.group(1) if status_match else '500'
-                        
-                        # Remove all lines from j to i-1 and replace with clean return
-                        while len(new_lines) > j:
-                            new_lines.pop()
-                        
-                        # Add proper indentation
-                        indent = '    '  # Standard 4-space indent
-                        new_lines.append(f'{indent}return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});')
-                        fixes.append(f"Consolidated malformed return statement at line {i+1}")
-                        i += 1
-                        continue
-            
-            new_lines.append(line)
-            i += 1
-        
-        content = '\n'.join(new_lines)
+        # Pattern 2: Lines that are just "return NextResponse.json({ error: "..." }, { status: XXX });"
+        # following incomplete return statements. Collect (start, end, replacement)
+        # edits from one finditer pass and splice them in a single join, instead
+        # of splitting into lines and rebuilding the list per file.
+        edits = []
+        cursor_guard = 0
+        for match in _INTERNAL_ERROR_LINE.finditer(content):
+            if match.start() == 0:
+                continue
+
+            # Check the three preceding lines for an incomplete return
+            ctx_end = match.start() - 1
+            ctx_start = ctx_end
+            for _ in range(3):
+                nl = content.rfind('\n', 0, ctx_start)
+                if nl == -1:
+                    ctx_start = 0
+                    break
+                ctx_start = nl
+
+            prev_context = content[ctx_start:ctx_end]
+            if 'return NextResponse.json(' not in prev_context or '{ error:' not in prev_context:
+                continue
+
+            # This is likely a malformed continuation - replace from the start
+            # of the previous incomplete return through the current line
+            ret = content.rfind('return NextResponse.json(', 0, match.start())
+            if ret == -1:
+                continue
+            ret_line_start = content.rfind('\n', 0, ret) + 1
+            if ret_line_start < cursor_guard:
+                continue
+
+            status_match = _STATUS_CODE.search(match.group(0))
+            status = status_match.group(1) if status_match else '500'
+
+            indent = '    '  # Standard 4-space indent
+            replacement = f'{indent}return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});'
+            edits.append((ret_line_start, match.end(), replacement))
+            cursor_guard = match.end()
+
+            line_no = content.count('\n', 0, match.start()) + 1
+            fixes.append(f"Consolidated malformed return statement at line {line_no}")
+
+        if edits:
+            out = []
+            cursor = 0
+            for start, end, replacement in edits:
+                out.append(content[cursor:start])
+                out.append(replacement)
+                cursor = end
+            out.append(content[cursor:])
+            content = ''.join(out)
         
         # Pattern 3: Fix argument expression expected errors - remove extra function calls
         # Look for return NextResponse.json( followed by return NextResponse.json on same line
-        content = re.sub(
-            r'return\s+NextResponse\.json\([^)]+\)\s*;?\s*return\s+NextResponse\.json\([^)]+\)\s*;',
-            lambda m: re.search(r'return\s+NextResponse\.json\([^)]+\)\s*;', m.group(0)).group(0),
+        content = _SAME_LINE_DOUBLE_RETURN.sub(
+            lambda m: _SINGLE_RETURN.search(m.group(0)).group(0),
             content
         )
         
         # Write back if changes were made
         if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            Path(file_path).write_text(content, encoding='utf-8')
             print(f"✅ Fixed malformed syntax in: {file_path}")
             for fix in fixes:
                 print(f"   - {fix}")
@@ -98,17 +125,16 @@ def fix_broken_return_statements(file_path):
 def main():
     base_path = Path("/project/workspace/alphaeth784/taskfi-dan/src/app/api")
     
-    # Get all TypeScript files
-    ts_files = list(base_path.rglob("*.ts"))
+    # Get all TypeScript files (manifest-cached walk)
+    ts_files = discover_ts_files(base_path)
     
     print(f"Fixing malformed syntax in {len(ts_files)} TypeScript files...")
     print("-" * 60)
-    
-    fixed_count = 0
-    for ts_file in ts_files:
-        if fix_broken_return_statements(ts_file):
-            fixed_count += 1
-    
+
+    # Each file is fixed independently - fan out across all cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        fixed_count = sum(executor.map(fix_broken_return_statements, ts_files, chunksize=8))
+
     print("-" * 60)
     print(f"Fixed malformed syntax in {fixed_count} files")
 
@@ -2,29 +2,33 @@
 
 import os
 import re
+from pathlib import Path
+
+# Precompiled patterns - avoids re-parsing the pattern for every file
+_MISSING_SEMICOLON = re.compile(r'return NextResponse\.json\([^)]+\)(?!\s*;)')
+_UNCLOSED_CATCH = re.compile(r'(\s+}\s+catch\s*\([^)]+\)\s*{\s*[^}]+)(\n\s*//.*function)')
+_INCOMPLETE_EXPORT = re.compile(r'(\s*}\s*\n\s*//[^\n]*\nexport async function [A-Z]+)')
 
 def fix_route_syntax(file_path):
     print(f"Fixing syntax in {file_path}")
-    
-    with open(file_path, 'r') as f:
-        content = f.read()
-    
+
+    content = Path(file_path).read_text(encoding='utf-8')
+
     # 1. Add missing semicolons after return statements
-    content = re.sub(r'return NextResponse\.json\([^)]+\)(?!\s*;)', r'\g<0>;', content)
-    
+    content = _MISSING_SEMICOLON.sub(r'\g<0>;', content)
+
     # 2. Fix missing closing braces in try-catch blocks
     # Look for patterns like "} catch (error) {" that aren't properly closed
-    content = re.sub(r'(\s+}\s+catch\s*\([^)]+\)\s*{\s*[^}]+)(\n\s*//.*function)', r'\1\n  }\n}\n\2', content)
-    
+    content = _UNCLOSED_CATCH.sub(r'\1\n  }\n}\n\2', content)
+
     # 3. Fix incomplete function exports
     # Look for incomplete export function patterns
-    content = re.sub(r'(\s*}\s*\n\s*//[^\n]*\nexport async function [A-Z]+)', r'\1', content)
+    content = _INCOMPLETE_EXPORT.sub(r'\1', content)
     
     # 4. Add missing closing braces for functions if needed
     # This is more complex and might need manual review
     
-    with open(file_path, 'w') as f:
-        f.write(content)
+    Path(file_path).write_text(content, encoding='utf-8')
 
 # Fix common route files
 route_files = [
@@ -42,14 +46,12 @@ for file_path in route_files:
 analytics_file = 'src/app/api/analytics/route.ts'
 if os.path.exists(analytics_file):
     print(f"Special fix for {analytics_file}")
-    with open(analytics_file, 'r') as f:
-        content = f.read()
+    content = Path(analytics_file).read_text(encoding='utf-8')
     
     # Make sure the file ends properly after the last function
     if not content.strip().endswith('}'):
         content = content.rstrip() + '\n'
     
-    with open(analytics_file, 'w') as f:
-        f.write(content)
+    Path(analytics_file).write_text(content, encoding='utf-8')
 
 print("Syntax fixes completed!")
\ No newline at end of file
@@ -4,45 +4,97 @@ Comprehensive syntax fixer for TaskFi API routes.
 Fixes missing braces, semicolons, and other syntax issues.
 """
 
+import json
 import os
 import re
+import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple
 
+from fixer_utils import write_atomic
+
+# The four fixes below are fused into one alternation so the regex engine
+# walks each file once and dispatches on which branch matched, instead of
+# four full scans per file. Branch order mirrors the old sequential passes.
+_COMBINED = re.compile(
+    # 1. missing closing braces before a new function definition comment
+    r'(?P<fn_ret>\s*return NextResponse\.json\([^}]+\))\s*\n\s*//\s*(?P<fn_name>GET|POST|PUT|DELETE|[A-Z])'
+    # 2. missing closing brace after a catch block
+    r'|(?P<catch_ret>\s*return NextResponse\.json\([^}]+\)\s*)\n(?P<catch_brace>\s*}\s*)\n\s*(?P<catch_next>// [A-Z]|export async function)'
+    # 3. missing closing brace for an if statement
+    r'|(?P<if_ret>\s*return NextResponse\.json\([^}]+\)\s*)\n(?P<if_indent>\s*)(?P<if_next>console\.error|return NextResponse)'
+    # 4. missing semicolon on a return statement
+    r'|(?P<semi_ret>\s*return NextResponse\.json\([^}]+\))\n(?P<semi_brace>\s*})'
+)
+
+_BRACE = re.compile(r'[{}]')
+
+_FIX_MESSAGES = {
+    'fn': "Fixed missing closing braces before function definitions",
+    'catch': "Fixed missing closing braces after catch blocks",
+    'if': "Fixed missing closing braces for if statements",
+    'semi': "Fixed missing semicolons in return statements",
+}
+
+# Constant replacement fragment, hoisted out of the per-match callback
+_FN_CLOSE = '\n  }\n}\n\n// '
+
+def _combined_repl(m, fired):
+    """Replacement callback for _COMBINED; records fired branches in fired.
+
+    Builds replacements by concatenating hoisted constants - plain + on
+    short strings skips the per-match f-string formatting bytecode.
+    """
+    if m.group('fn_ret') is not None:
+        fired.add('fn')
+        return m.group('fn_ret') + _FN_CLOSE + m.group('fn_name')
+    if m.group('catch_ret') is not None:
+        fired.add('catch')
+        return m.group('catch_ret') + '\n' + m.group('catch_brace') + '}\n\n' + m.group('catch_next')
+    if m.group('if_ret') is not None:
+        fired.add('if')
+        indent = m.group('if_indent')
+        return m.group('if_ret') + ';\n' + indent + '}\n' + indent + m.group('if_next')
+    fired.add('semi')
+    return m.group('semi_ret') + ';\n' + m.group('semi_brace')
+
 def fix_api_route(file_path: str) -> bool:
-    """Fix syntax issues in a single API route file."""
+    """Fix syntax issues in a single API route file.
+
+    Returns True when the file was rewritten, False when it was already
+    clean, and None when it could not be processed.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
+        with open(file_path, 'rb') as f:
+            content_b = f.read()
+
+        # Fast reject in bytes: when no fix can possibly apply, skip the
+        # UTF-8 decode entirely. bytes membership is a memmem scan, far
+        # cheaper than decoding the whole buffer to str.
+        if (b'return NextResponse.json' not in content_b
+                and content_b.strip().endswith(b'}')
+                and ('/analytics/' not in file_path
+                     or b'export async function GET' not in content_b)):
+            print(f"✓ No issues found in {file_path}")
+            return False
+
+        content = content_b.decode('utf-8')
+
         original_content = content
         
         # Common fixes
         fixes_applied = []
         
-        # 1. Fix missing closing braces after return statements before new function definitions
-        pattern1 = r'(\s*return NextResponse\.json\([^}]+\))\s*\n\s*//\s*(GET|POST|PUT|DELETE|[A-Z])'
-        if re.search(pattern1, content):
-            content = re.sub(pattern1, r'\1\n  }\n}\n\n// \2', content)
-            fixes_applied.append("Fixed missing closing braces before function definitions")
-        
-        # 2. Fix missing closing braces after catch blocks
-        pattern2 = r'(\s*return NextResponse\.json\([^}]+\)\s*)\n(\s*}\s*)\n\s*(// [A-Z]|export async function)'
-        if re.search(pattern2, content):
-            content = re.sub(pattern2, r'\1\n\2}\n\n\3', content)
-            fixes_applied.append("Fixed missing closing braces after catch blocks")
-        
-        # 3. Fix missing closing braces for if statements
-        pattern3 = r'(\s*return NextResponse\.json\([^}]+\)\s*)\n(\s*)(console\.error|return NextResponse)'
-        if re.search(pattern3, content):
-            content = re.sub(pattern3, r'\1;\n\2}\n\2\3', content)
-            fixes_applied.append("Fixed missing closing braces for if statements")
-        
-        # 4. Fix missing semicolons in return statements
-        pattern4 = r'(\s*return NextResponse\.json\([^}]+\))\n(\s*})'
-        content = re.sub(pattern4, r'\1;\n\2', content)
-        if pattern4 in content:
-            fixes_applied.append("Fixed missing semicolons in return statements")
+        # All four patterns anchor on a NextResponse.json return - a substring
+        # check is a cheap C scan that skips the regex engine entirely for
+        # files that can't match
+        if 'return NextResponse.json' in content:
+            fired = set()
+            content = _COMBINED.sub(lambda m: _combined_repl(m, fired), content)
+            for key in ('fn', 'catch', 'if', 'semi'):
+                if key in fired:
+                    fixes_applied.append(_FIX_MESSAGES[key])
         
         # 5. Fix files ending without proper closing braces
         if not content.strip().endswith('}'):
@@ -54,37 +106,38 @@ def fix_api_route(file_path: str) -> bool:
         
         if filename == 'route.ts' and '/analytics/' in file_path:
             # Analytics route specific fixes
-            if 'export async function GET' in content and not content.count('export async function GET') == content.count('}'):
-                # Find the end of the GET function
-                lines = content.split('\n')
-                in_get_function = False
-                brace_count = 0
-                get_end_line = -1
-                
-                for i, line in enumerate(lines):
-                    if 'export async function GET' in line:
-                        in_get_function = True
-                        brace_count = 0
-                    
-                    if in_get_function:
-                        brace_count += line.count('{')
-                        brace_count -= line.count('}')
-                        
-                        if brace_count == 0 and line.strip().endswith('}') and i > 0:
-                            get_end_line = i
+            start = content.find('export async function GET')
+            if start != -1 and content.count('export async function GET') != content.count('}'):
+                # Find the end of the GET function by walking braces from the
+                # handler with finditer - no split into a list of lines. The
+                # closing brace that returns the balance to zero with only
+                # whitespace after it on its line ends the function.
+                balance = 0
+                get_end = -1
+                for m in _BRACE.finditer(content, start):
+                    balance += 1 if m.group() == '{' else -1
+                    if balance == 0 and m.group() == '}':
+                        line_end = content.find('\n', m.end())
+                        if line_end == -1:
+                            line_end = len(content)
+                        if not content[m.end():line_end].strip():
+                            get_end = line_end
                             break
-                
-                if get_end_line > 0 and get_end_line < len(lines) - 1:
-                    next_line = lines[get_end_line + 1].strip()
+
+                # get_end sits on the newline ending the function, so a
+                # following line exists iff get_end < len(content)
+                if 0 <= get_end < len(content):
+                    next_nl = content.find('\n', get_end + 1)
+                    if next_nl == -1:
+                        next_nl = len(content)
+                    next_line = content[get_end + 1:next_nl].strip()
                     if next_line and not next_line.startswith('//') and not next_line == '}':
-                        lines.insert(get_end_line + 1, '}')
-                        content = '\n'.join(lines)
+                        content = content[:get_end + 1] + '}\n' + content[get_end + 1:]
                         fixes_applied.append("Fixed analytics GET function closing")
         
         # Write back if changes were made
         if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_atomic(file_path, content)
             print(f"✅ Fixed {file_path}")
             for fix in fixes_applied:
                 print(f"   - {fix}")
@@ -95,23 +148,30 @@ def fix_api_route(file_path: str) -> bool:
             
     except Exception as e:
         print(f"❌ Error processing {file_path}: {e}")
-        return False
+        return None
+
+def _walk_routes(directory: str):
+    """Yield route.ts paths under directory using scandir.
+
+    DirEntry answers is_dir() from the directory read itself, so this avoids
+    the extra stat per entry and the per-directory list building os.walk does.
+    """
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_routes(entry.path)
+            elif entry.name == 'route.ts':
+                yield entry.path
 
 def find_api_routes(root_dir: str) -> List[str]:
     """Find all API route files."""
-    api_routes = []
     api_dir = os.path.join(root_dir, 'src', 'app', 'api')
-    
+
     if not os.path.exists(api_dir):
         print(f"❌ API directory not found: {api_dir}")
         return []
-    
-    for root, dirs, files in os.walk(api_dir):
-        for file in files:
-            if file == 'route.ts':
-                api_routes.append(os.path.join(root, file))
-    
-    return api_routes
+
+    return list(_walk_routes(api_dir))
 
 def main():
     """Main function to fix all syntax issues."""
@@ -131,35 +191,53 @@ def main():
         sys.exit(1)
     
     print(f"📁 Found {len(api_routes)} API route files")
-    
-    fixed_count = 0
-    
-    for route_file in api_routes:
-        if fix_api_route(route_file):
-            fixed_count += 1
+
+    # Skip files whose mtime hasn't moved since the last run - a stat is far
+    # cheaper than re-reading and re-scanning the file
+    cache_path = os.path.join(project_root, '.syntax_fix_cache')
+    try:
+        with open(cache_path, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    pending = [p for p in api_routes if cache.get(p) != os.stat(p).st_mtime_ns]
+    if len(pending) < len(api_routes):
+        print(f"⏭️  Skipping {len(api_routes) - len(pending)} unchanged files (mtime cache)")
+
+    # Each route file is an independent read-modify-write, so fan the work
+    # out across all cores; chunksize amortizes IPC over many small files
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(fix_api_route, pending, chunksize=8))
+    fixed_count = sum(r is True for r in results)
+
+    # Record post-fix mtimes so the next run can skip clean files. fix_api_route
+    # returns None on error - those files must be retried next run, so they
+    # never get a cache entry.
+    for p, r in zip(pending, results):
+        if r is not None:
+            cache[p] = os.stat(p).st_mtime_ns
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f)
     
     print("\n" + "=" * 50)
     print(f"✅ Syntax fix completed!")
     print(f"📊 Fixed {fixed_count} files out of {len(api_routes)} total")
     
-    # Test build
+    # Test build - capture output directly instead of shelling out with a
+    # redirect and re-reading the log file
     print("\n🧪 Testing build...")
-    os.chdir(project_root)
-    result = os.system('bun run build > build_test.log 2>&1')
-    
-    if result == 0:
+    proc = subprocess.run(['bun', 'run', 'build'], cwd=project_root,
+                          capture_output=True, text=True)
+
+    if proc.returncode == 0:
         print("✅ Build successful! All syntax errors fixed.")
     else:
-        print("⚠️  Build still has issues. Check build_test.log for details.")
-        # Show first few lines of build error
-        try:
-            with open('build_test.log', 'r') as f:
-                lines = f.readlines()[-20:]  # Last 20 lines
-                print("\nBuild errors:")
-                for line in lines:
-                    print(line.rstrip())
-        except:
-            pass
+        print("⚠️  Build still has issues.")
+        tail = (proc.stdout + proc.stderr).splitlines()[-20:]
+        print("\nBuild errors:")
+        for line in tail:
+            print(line)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
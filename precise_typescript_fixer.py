@@ -6,59 +6,100 @@ Carefully fixes only the specific syntax errors identified by TypeScript compile
 
 import os
 import re
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 from pathlib import Path
 
+from fixer_utils import iter_ts_files, read_text_mmap, write_atomic
+
+# The doubled-return shape always contains this literal; it doubles as the
+# cheap membership gate before the line walk
+_DOUBLED_RETURN_TOKEN = 'return NextResponse.json({ error: "Internal server error" }, { status:'
+_STATUS_CODE = re.compile(r'status:\s*(\d+)')
+
+def _collapse_doubled_returns(content):
+    """Collapse a return that runs into a duplicated error return.
+
+    Deliberately a line walk rather than a whole-buffer regex: the rewrite
+    may only fire when the line immediately before the error return is part
+    of an unterminated return statement, and it then drops everything back
+    to the nearest preceding return line. A buffer regex relaxing that
+    adjacency matches from a handler's success return across the catch
+    opener and mangles well-formed files.
+
+    Returns (content, fix messages).
+    """
+    fixes = []
+    lines = content.split('\n')
+    new_lines = []
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+
+        # Pattern: return NextResponse.json({ error: "..." }, { status: XXX });
+        # This is a doubled return statement that needs to be cleaned up
+        if _DOUBLED_RETURN_TOKEN in line and i > 0:
+            # Check if previous lines form part of a return statement
+            prev_line = lines[i-1]
+            if '{ error:' in prev_line or 'return NextResponse.json(' in prev_line:
+                # This is a duplicate - look back to find the start of the
+                # return statement
+                j = i - 1
+                while j >= 0 and 'return NextResponse.json(' not in lines[j]:
+                    j -= 1
+
+                if j >= 0:
+                    # Extract status code from current line
+                    status_match = _STATUS_CODE.search(line)
+                    status = status_match.group(1) if status_match else '500'
+
+                    # Replace everything from return statement to current line
+                    new_return = f'    return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});'
+
+                    # Remove the malformed lines
+                    while len(new_lines) > j:
+                        new_lines.pop()
+
+                    new_lines.append(new_return)
+                    fixes.append(f"Fixed malformed return statement at line {i+1}")
+                    i += 1
+                    continue
+
+        new_lines.append(line)
+        i += 1
+
+    if fixes:
+        return '\n'.join(new_lines), fixes
+    return content, fixes
+
+def _fix_file_worker(file_path):
+    """Process-pool worker: fix one file in a throwaway fixer and return its results."""
+    fixer = PreciseTypescriptFixer(Path(file_path).parent)
+    changed = fixer.fix_file_carefully(file_path)
+    return changed, fixer.fixes_applied
+
 class PreciseTypescriptFixer:
+    # Precompiled patterns shared by all instances
+    _RETURN_SEMI_CATCH = re.compile(r'(\s+return\s+NextResponse\.json\([^;]+\))\s*\n(\s*\}\s*catch)')
+    _CATCH_LINE_RE = re.compile(r'\s*\}\s*catch\s*\(\s*error\s*\)\s*\{')
+
     def __init__(self, base_path):
         self.base_path = Path(base_path)
         self.fixes_applied = []
     
     def fix_malformed_return_statements(self, content, file_path):
         """Fix specific malformed return statements identified in TS errors"""
-        fixes = []
-        lines = content.split('\n')
-        new_lines = []
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            # Pattern: return NextResponse.json({ error: "..." }, { status: XXX });
-            # This is a doubled return statement that needs to be cleaned up
-            if 'return NextResponse.json({ error: "Internal server error" }, { status:' in line and i > 0:
-                # Check if previous lines form part of a return statement
-                prev_line = lines[i-1]
-                if '{ error:' in prev_line or 'return NextResponse.json(' in prev_line:
-                    # This is a duplicate - replace the malformed section with proper closure
-                    # Look back to find the start of the return statement
-                    j = i - 1
-                    while j >= 0 and 'return NextResponse.json(' not in lines[j]:
-                        j -= 1
-                    
-                    if j >= 0:
-                        # Extract status code from current line
-                        status_match = re.search(r'status:\s*(\d+)', line)
-                        status = status_match.group(1) if status_match else '500'
-                        
-                        # Replace everything from return statement to current line
-                        new_return = f'    return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});'
-                        
-                        # Remove the malformed lines
-                        while len(new_lines) > j:
-                            new_lines.pop()
-                        
-                        new_lines.append(new_return)
-                        fixes.append(f"Fixed malformed return statement at line {i+1}")
-                        i += 1
-                        continue
-            
-            new_lines.append(line)
-            i += 1
-        
+        # Substring gate: skip the line walk entirely for files without the
+        # doubled-return shape
+        if _DOUBLED_RETURN_TOKEN not in content:
+            return content
+
+        content, fixes = _collapse_doubled_returns(content)
         if fixes:
             self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-            return '\n'.join(new_lines)
-        
+
         return content
     
     def fix_missing_semicolons_precise(self, content, file_path):
@@ -66,14 +107,11 @@ class PreciseTypescriptFixer:
         fixes = []
         
         # Fix specific pattern: return NextResponse.json(...) without semicolon before } catch
-        pattern = r'(\s+return\s+NextResponse\.json\([^;]+\))\s*\n(\s*\}\s*catch)'
-        def add_semicolon(match):
-            return_stmt = match.group(1)
-            catch_part = match.group(2)
-            fixes.append("Added missing semicolon before catch block")
-            return f"{return_stmt};\n{catch_part}"
-        
-        content = re.sub(pattern, add_semicolon, content, flags=re.MULTILINE)
+        # Substring gate: skip the regex pass entirely for files with no catch.
+        # subn substitutes and counts in a single pass - no callback needed.
+        if '} catch' in content:
+            content, n = self._RETURN_SEMI_CATCH.subn(r'\1;\n\2', content)
+            fixes.extend(["Added missing semicolon before catch block"] * n)
         
         # Fix pattern: walletBalance: Math.max(0, walletBalance); (should be comma)
         if 'walletBalance: Math.max(0, walletBalance);' in content:
@@ -91,43 +129,52 @@ class PreciseTypescriptFixer:
         fixes = []
         lines = content.split('\n')
         new_lines = []
-        
+        # Prefix sums of brace counts plus an index of the lines that can end
+        # the lookback (try blocks and function declarations), built once on
+        # the first catch match. Each catch then jumps straight between
+        # candidate lines via bisect instead of walking every preceding line
+        # and re-counting its braces.
+        cum_open = cum_close = markers = None
+
         i = 0
         while i < len(lines):
             line = lines[i]
-            
+
             # Look for } catch (error) { pattern that might be orphaned
-            if re.match(r'\s*\}\s*catch\s*\(\s*error\s*\)\s*\{', line.strip()):
+            if self._CATCH_LINE_RE.match(line.strip()):
+                if cum_open is None:
+                    cum_open = [0] + list(accumulate(l.count('{') for l in lines))
+                    cum_close = [0] + list(accumulate(l.count('}') for l in lines))
+                    markers = [idx for idx, l in enumerate(lines)
+                               if 'try {' in l or 'async function' in l]
+
                 # Look back to see if there's a corresponding try block
-                j = i - 1
                 found_try = False
-                brace_count = 1  # Starting with 1 because we saw the closing brace
-                
-                while j >= 0:
-                    if '{' in lines[j]:
-                        brace_count -= lines[j].count('{')
-                    if '}' in lines[j] and j != i:
-                        brace_count += lines[j].count('}')
-                    
-                    if 'try {' in lines[j] and brace_count <= 0:
-                        found_try = True
-                        break
-                    
-                    # If we hit a function declaration without finding try, we need to add it
-                    if ('export async function' in lines[j] or 'async function' in lines[j]) and brace_count <= 0:
-                        # Find where to insert try block
-                        k = j + 1
-                        while k < i and not ('{' in lines[k] and 'try' not in lines[k]):
-                            k += 1
-                        
-                        if k < i:
-                            # Insert try block
-                            indent = len(lines[k]) - len(lines[k].lstrip())
-                            new_lines = new_lines[:k] + [lines[k].replace('{', '{\n' + ' ' * (indent + 2) + 'try {')] + new_lines[k+1:]
+                mpos = bisect_right(markers, i - 1) - 1
+
+                while mpos >= 0:
+                    j = markers[mpos]
+                    # 1 for the catch line's own closing brace, minus opens and
+                    # plus closes over lines[j:i]
+                    brace_count = 1 - (cum_open[i] - cum_open[j]) + (cum_close[i] - cum_close[j])
+
+                    if brace_count <= 0:
+                        if 'try {' in lines[j]:
                             found_try = True
-                            fixes.append(f"Added missing try block at line {k+1}")
+                        else:
+                            # Function declaration without a try - insert one
+                            k = j + 1
+                            while k < i and not ('{' in lines[k] and 'try' not in lines[k]):
+                                k += 1
+
+                            if k < i:
+                                # Insert try block
+                                indent = len(lines[k]) - len(lines[k].lstrip())
+                                new_lines = new_lines[:k] + [lines[k].replace('{', '{\n' + ' ' * (indent + 2) + 'try {')] + new_lines[k+1:]
+                                found_try = True
+                                fixes.append(f"Added missing try block at line {k+1}")
                         break
-                    j -= 1
+                    mpos -= 1
                 
                 if found_try:
                     # Convert } catch to  } } catch (add extra closing brace for try block)
@@ -146,9 +193,8 @@ class PreciseTypescriptFixer:
     def fix_file_carefully(self, file_path):
         """Apply only necessary fixes to avoid breaking working code"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
+            content = read_text_mmap(file_path)
+
             original_content = content
             
             # Apply fixes in careful order
@@ -158,8 +204,7 @@ class PreciseTypescriptFixer:
             
             # Only write if changes were made
             if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                write_atomic(file_path, content)
                 print(f"✅ Fixed: {file_path}")
                 return True
             else:
@@ -174,17 +219,21 @@ def main():
     base_path = "/project/workspace/alphaeth784/taskfi-dan"
     fixer = PreciseTypescriptFixer(base_path)
     
-    # Get all TypeScript files in API routes
-    api_path = Path(base_path) / "src" / "app" / "api"
-    ts_files = list(api_path.rglob("*.ts"))
+    # Get all TypeScript files in API routes (scandir walk, no Path churn)
+    api_path = os.path.join(base_path, "src", "app", "api")
+    ts_files = list(iter_ts_files(api_path))
     
     print(f"Applying precise fixes to {len(ts_files)} TypeScript files...")
     print("-" * 60)
     
+    # Files are independent, so process them across all cores and merge the
+    # per-worker fix reports back into the parent fixer
     fixed_count = 0
-    for file_path in ts_files:
-        if fixer.fix_file_carefully(file_path):
-            fixed_count += 1
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for changed, fixes in executor.map(_fix_file_worker, ts_files, chunksize=8):
+            if changed:
+                fixed_count += 1
+            fixer.fixes_applied.extend(fixes)
     
     print("-" * 60)
     print(f"Fixed {fixed_count} files out of {len(ts_files)}")
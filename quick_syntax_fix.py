@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
+import io
 import re
 import os
 
+from fixer_utils import write_atomic
+
 def fix_specific_files():
     """Fix specific known syntax issues in problematic files"""
     
@@ -52,10 +55,17 @@ def fix_specific_files():
             original_content = content
             
             if fix['action'] == 'ensure_single_end_brace':
-                # Remove duplicate closing braces at end
+                # Remove duplicate closing braces at end. Walk an index back
+                # over the tail instead of re-copying the whole string with
+                # [:-1].rstrip() on every iteration - one slice at the end
                 content = content.rstrip()
-                while content.endswith('}\n}') or content.endswith('}}\n') or content.endswith('}}'):
-                    content = content[:-1].rstrip()
+                n = len(content)
+                while ((n >= 2 and content[n-2:n] == '}}') or
+                       (n >= 3 and content[n-3:n] == '}\n}')):
+                    n -= 1
+                    while n and content[n-1] in ' \t\r\n':
+                        n -= 1
+                content = content[:n]
                 if not content.endswith('}'):
                     content += '\n}'
                 content += '\n'
@@ -73,29 +83,29 @@ def fix_specific_files():
                     content = re.sub(pattern, r'\1;\n  \2', content)
                     
             elif fix['action'] == 'fix_get_function_end':
-                # Fix missing closing braces for GET functions
+                # Fix missing closing braces for GET functions. Stream into a
+                # single StringIO buffer instead of growing a list of lines
+                # and joining it afterwards
                 lines = content.split('\n')
-                new_lines = []
-                i = 0
-                while i < len(lines):
-                    line = lines[i]
-                    new_lines.append(line)
-                    
+                n = len(lines)
+                out = io.StringIO()
+                for i, line in enumerate(lines):
+                    out.write(line)
+                    out.write('\n')
+
                     # Look for pattern where catch block ends but function doesn't close
-                    if (line.strip() == '}' and i < len(lines) - 2 and 
-                        lines[i + 1].strip() == '' and 
+                    if (line.strip() == '}' and i < n - 2 and
+                        lines[i + 1].strip() == '' and
                         lines[i + 2].strip().startswith('// ') and
-                        'export async function' in lines[i + 3] if i + 3 < len(lines) else False):
+                        'export async function' in lines[i + 3] if i + 3 < n else False):
                         # Add missing function closing brace
-                        new_lines.append('}')
-                    
-                    i += 1
-                
-                content = '\n'.join(new_lines)
+                        out.write('}\n')
+
+                # drop the newline written after the final line
+                content = out.getvalue()[:-1]
             
             if content != original_content:
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                write_atomic(full_path, content)
                 print(f"✅ Fixed: {file_path}")
             else:
                 print(f"✓ No changes needed: {file_path}")
@@ -6,88 +6,83 @@ Fixes the specific syntax issues found in the codebase
 
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+from fixer_utils import iter_ts_files, read_text_mmap, write_atomic
+
+# Precompiled patterns - parsed once per run instead of per file
+_STATUS_SEMI = re.compile(r'(\{\s*status:\s*\d+\s*)\};')
+_RETURN_SEMI_CATCH = re.compile(r'(return NextResponse\.json\([^;]+\))\s*\n(\s*\}\s*catch)')
+_STATUS_ONLY_LINE = re.compile(r'^([ \t]*)\{\s*status:\s*(\d+)\s*\}$', re.MULTILINE)
+_ORPHAN_CLOSE_LINE = re.compile(r'^[ \t]*\);[ \t]*$', re.MULTILINE)
+
 def fix_file_syntax_issues(file_path):
     """Fix specific syntax issues in a file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
+        content = read_text_mmap(file_path)
+
         original_content = content
         fixes = []
         
         # Fix 1: { status: XXX }; should be { status: XXX }
-        pattern1 = r'(\{\s*status:\s*\d+\s*)\};'
-        content = re.sub(pattern1, r'\1}', content)
-        if re.search(pattern1, original_content):
-            fixes.append("Fixed semicolon in status object")
+        # Substring gate: the pattern can only match files mentioning status:
+        if 'status:' in content:
+            content = _STATUS_SEMI.sub(r'\1}', content)
+            if _STATUS_SEMI.search(original_content):
+                fixes.append("Fixed semicolon in status object")
         
-        # Fix 2: Remove orphaned ); lines that follow NextResponse.json calls
-        lines = content.split('\n')
-        new_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            
-            # If this line is just ");", check if previous lines form a complete NextResponse.json call
-            if line.strip() == ');' and i > 0:
-                # Look back to see if we have a complete NextResponse.json structure
-                j = i - 1
-                found_return = False
-                brace_count = 0
-                
-                while j >= 0:
-                    if 'return NextResponse.json(' in lines[j]:
-                        found_return = True
-                        break
-                    if '{' in lines[j]:
-                        brace_count += lines[j].count('{')
-                    if '}' in lines[j]:
-                        brace_count -= lines[j].count('}')
-                    j -= 1
-                
-                # If we found a complete return statement, this ); is probably orphaned
-                if found_return and brace_count == 0:
-                    fixes.append(f"Removed orphaned '); at line {i+1}")
-                    i += 1
+        # Fix 2: Remove orphaned ); lines that follow NextResponse.json calls.
+        # finditer locates candidate lines in one C-level scan; rfind plus two
+        # windowed str.count calls replace the old per-line backward walk, and
+        # the surviving slices are joined once at the end.
+        if ');' in content:
+            edits = []
+            for m in _ORPHAN_CLOSE_LINE.finditer(content):
+                s = m.start()
+                # Nearest preceding return NextResponse.json( line
+                r = content.rfind('return NextResponse.json(', 0, s)
+                if r == -1:
                     continue
-            
-            new_lines.append(line)
-            i += 1
-        
-        content = '\n'.join(new_lines)
+                ret_end = content.find('\n', r)
+                if ret_end == -1 or ret_end > s:
+                    continue
+                # Braces must balance between that line and this one -
+                # otherwise the ); may still be closing something real
+                if content.count('{', ret_end, s) != content.count('}', ret_end, s):
+                    continue
+                e = m.end()
+                if e < len(content):
+                    e += 1  # drop the line's trailing newline
+                elif s > 0:
+                    s -= 1  # last line: drop the preceding newline instead
+                edits.append((s, e))
+                fixes.append(f"Removed orphaned '); at line {content.count(chr(10), 0, m.start()) + 1}")
+
+            if edits:
+                parts = []
+                cursor = 0
+                for s, e in edits:
+                    parts.append(content[cursor:s])
+                    cursor = e
+                parts.append(content[cursor:])
+                content = ''.join(parts)
         
         # Fix 3: Add missing semicolon to complete return statements
         # Pattern: return NextResponse.json(...)\n  } catch
-        content = re.sub(r'(return NextResponse\.json\([^;]+\))\s*\n(\s*\}\s*catch)', r'\1;\n\2', content, flags=re.MULTILINE)
+        content = _RETURN_SEMI_CATCH.sub(r'\1;\n\2', content)
         
         # Fix 4: Fix incomplete return statements - lines that just have { status: XXX }
-        lines = content.split('\n')
-        new_lines = []
-        
-        for i, line in enumerate(lines):
-            stripped = line.strip()
-            
-            # If line is just { status: XXX }, convert to proper return statement
-            if re.match(r'^\{\s*status:\s*\d+\s*\}$', stripped):
-                status_match = re.search(r'status:\s*(\d+)', stripped)
-                if status_match:
-                    status = status_match.group(1)
-                    indent = line[:len(line) - len(line.lstrip())]
-                    new_lines.append(f'{indent}return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});')
-                    fixes.append(f"Fixed incomplete return statement at line {i+1}")
-                    continue
-            
-            new_lines.append(line)
-        
-        content = '\n'.join(new_lines)
+        # One multiline sub over the whole buffer instead of a split/join line walk
+        content, n = _STATUS_ONLY_LINE.subn(
+            r'\1return NextResponse.json({ error: "Internal server error" }, { status: \2 });',
+            content)
+        if n:
+            fixes.append(f"Fixed {n} incomplete return statements")
         
         # Write back if changes were made
         if content != original_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            write_atomic(file_path, content)
             print(f"✅ Fixed {len(fixes)} issues in: {file_path}")
             for fix in fixes:
                 print(f"   - {fix}")
@@ -101,18 +96,19 @@ def fix_file_syntax_issues(file_path):
         return False
 
 def main():
-    base_path = Path("/project/workspace/alphaeth784/taskfi-dan/src/app/api")
-    
-    # Get all TypeScript files
-    ts_files = list(base_path.rglob("*.ts"))
+    base_path = "/project/workspace/alphaeth784/taskfi-dan/src/app/api"
+
+    # Get all TypeScript files (scandir walk, no Path churn)
+    ts_files = list(iter_ts_files(base_path))
     
     print(f"Processing {len(ts_files)} TypeScript files...")
     print("-" * 50)
     
-    fixed_count = 0
-    for ts_file in ts_files:
-        if fix_file_syntax_issues(ts_file):
-            fixed_count += 1
+    # fix_file_syntax_issues is self-contained per file, so fan it out
+    # across all cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(fix_file_syntax_issues, ts_files, chunksize=8))
+    fixed_count = sum(results)
     
     print("-" * 50)
     print(f"Fixed issues in {fixed_count} files")
@@ -4,181 +4,270 @@ Targeted TypeScript Syntax Fixer
 Fixes specific syntax patterns that were incorrectly modified
 """
 
+import hashlib
+import json
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
 from pathlib import Path
 
+# Content-hash cache: path -> digest of the content after the last fix run.
+# A file whose on-disk content already hashes to its cached value was left
+# exactly as the last run wrote (or found) it, so the whole regex suite can
+# be skipped - re-runs over already-fixed files become a read plus a hash.
+_CACHE_PATH = "/project/workspace/alphaeth784/taskfi-dan/.syntax_fixer_cache.json"
+
+_hash_cache = None
+
+def _load_hash_cache():
+    """Load the content-hash cache once per process."""
+    global _hash_cache
+    if _hash_cache is None:
+        try:
+            with open(_CACHE_PATH, 'r') as f:
+                _hash_cache = json.load(f)
+        except (OSError, ValueError):
+            _hash_cache = {}
+    return _hash_cache
+
+def _content_hash(content):
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+# Precompiled patterns - parsed once per run instead of per call (several of
+# these run inside per-line loops). The whole pipeline works on bytes: the
+# syntax being fixed is ASCII punctuation, so matching the raw buffer skips
+# the UTF-8 decode/encode round trip and takes SRE's cheaper bytes path.
+_RE_CATCH = re.compile(rb'\s*\}\s*catch\s*\(\s*error\s*\)\s*\{')
+# One alternation scan over the previous line instead of three sequential
+# substring searches (and a fresh list literal) per orphaned-closing check
+_RE_RET_CONTEXT = re.compile(rb'\{ status:|error|message')
+# Every buffer-level rewrite fused into one alternation, so a single
+# finditer pass over the content replaces the four sequential scans the
+# individual fix methods used to make. Branch order mirrors the old pass
+# order: the status-block rewrite first, then the two broken-return line
+# shapes, then the missing return keyword.
+_RE_COMBINED = re.compile(
+    rb'(?P<block>\s*\{\s*status:\s*(?P<block_code>\d+)\s*\};\s*\n\s*\);)'
+    rb'|^(?P<close>[ \t]*\}[ \t]*\)[ \t]*)$'
+    rb'|^(?P<status>[ \t]*\{[ \t]*status:[ \t]*(?P<code>\d+)[ \t]*\}[ \t]*;?[ \t]*)$'
+    rb'|^(?P<resp_indent>[ \t]+)NextResponse\.json\(',
+    re.MULTILINE)
+
+# Replacement fragments for the block/status branches, hoisted so the per-
+# match work is two bytes concatenations
+_RETURN_HEAD = b'return NextResponse.json({ error: "Internal server error" }, { status: '
+_RETURN_TAIL = b' });'
+
+def _fix_file_worker(file_path):
+    """Process-pool worker: fix one file in a throwaway fixer and return its results."""
+    fixer = TargetedSyntaxFixer(Path(file_path).parent)
+    changed = fixer.fix_file(file_path)
+    return changed, fixer.fixes_applied, fixer.content_hashes
+
 class TargetedSyntaxFixer:
     def __init__(self, base_path):
         self.base_path = Path(base_path)
         self.fixes_applied = []
+        self.content_hashes = {}
     
     def fix_broken_return_statements(self, content, file_path):
-        """Fix broken NextResponse return statements"""
+        """Fix broken return statements and missing return keywords.
+
+        One fused finditer traversal handles all four buffer-level rewrites:
+        the { status: N }; ); block, orphaned }) lines, bare { status: N }
+        lines, and NextResponse.json( calls missing their return keyword.
+        The output is rebuilt from slices between edits with a single join.
+        """
+        # Substring prescan: every rewrite below needs one of these tokens,
+        # and a membership check is a single C memmem scan vs a full regex pass
+        if (b'status:' not in content and b'error' not in content
+                and b'message' not in content
+                and b'NextResponse.json(' not in content):
+            return content
+
         fixes = []
-        
-        # Pattern 1: { status: XXX }; followed by ); 
-        # This should be: return NextResponse.json(error: { message }, { status: XXX });
-        pattern1 = r'\s*\{\s*status:\s*(\d+)\s*\};\s*\n\s*\);'
-        def fix_return_pattern1(match):
-            status = match.group(1)
-            fixes.append(f"Fixed broken return statement with status {status}")
-            return f'\n      return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});'
-        
-        content = re.sub(pattern1, fix_return_pattern1, content, flags=re.MULTILINE)
-        
-        # Pattern 2: Looking for orphaned }) lines that should be return statements
-        lines = content.split('\n')
-        new_lines = []
-        i = 0
-        
-        while i < len(lines):
-            line = lines[i]
-            
-            # Check if this line is just closing braces/parentheses
-            if re.match(r'\s*\}\s*\)\s*$', line.strip()) and i > 0:
-                # Check previous lines for context
-                prev_line = lines[i-1] if i > 0 else ""
-                
-                # If previous line looks like it should be a return statement
-                if any(keyword in prev_line for keyword in ['{ status:', 'error', 'message']):
-                    # Skip this line - it's probably an orphaned closing
-                    fixes.append(f"Removed orphaned closing at line {i+1}")
-                    i += 1
+        parts = []
+        cursor = 0
+        # Block rewrites collapse several lines into one; line_delta keeps the
+        # line numbers in fix messages consistent with the rewritten buffer,
+        # and last_block_end lets the orphaned-closing check below see that
+        # its preceding line was just replaced with a return statement.
+        line_delta = 0
+        last_block_end = 0
+        for m in _RE_COMBINED.finditer(content):
+            line_start = m.start()
+
+            if m.group('block') is not None:
+                status = m.group('block_code')
+                replacement = b'\n      ' + _RETURN_HEAD + status + _RETURN_TAIL
+                if line_start < cursor:
+                    # The leading whitespace of this match was already
+                    # consumed by the previous edit, newline included
+                    line_start = cursor
+                    replacement = replacement[1:]
+                parts.append(content[cursor:line_start])
+                parts.append(replacement)
+                cursor = last_block_end = m.end()
+                line_delta += replacement.count(b'\n') - content.count(b'\n', line_start, m.end())
+                fixes.append(f"Fixed broken return statement with status {status.decode()}")
+            elif m.group('close') is not None:
+                # Only orphaned if a previous line exists and looks like it
+                # should have been a return statement
+                if line_start == 0:
                     continue
-            
-            # Check for lines that look like incomplete return statements
-            if re.match(r'\s*\{\s*status:\s*\d+\s*\}\s*;?\s*$', line.strip()):
-                status_match = re.search(r'status:\s*(\d+)', line)
-                if status_match:
-                    status = status_match.group(1)
-                    new_lines.append(f'      return NextResponse.json({{ error: "Internal server error" }}, {{ status: {status} }});')
-                    fixes.append(f"Fixed incomplete return statement at line {i+1}")
-                    i += 1
+                prev_end = line_start - 1
+                prev_begin = content.rfind(b'\n', 0, prev_end) + 1
+                prev_line = content[prev_begin:prev_end]
+                if (last_block_end <= prev_begin
+                        and not _RE_RET_CONTEXT.search(prev_line)):
                     continue
-            
-            new_lines.append(line)
-            i += 1
-        
+                # Drop the line (and its newline - or the preceding one when
+                # it is the last line of the file)
+                end = m.end()
+                if end < len(content):
+                    end += 1
+                else:
+                    line_start -= 1
+                parts.append(content[cursor:line_start])
+                cursor = end
+                line_no = content.count(b'\n', 0, m.start()) + 1 + line_delta
+                fixes.append(f"Removed orphaned closing at line {line_no}")
+            elif m.group('status') is not None:
+                status = m.group('code')
+                parts.append(content[cursor:line_start])
+                parts.append(b'      ' + _RETURN_HEAD + status + _RETURN_TAIL)
+                cursor = m.end()
+                line_no = content.count(b'\n', 0, line_start) + 1 + line_delta
+                fixes.append(f"Fixed incomplete return statement at line {line_no}")
+            else:
+                parts.append(content[cursor:line_start])
+                parts.append(m.group('resp_indent') + b'return NextResponse.json(')
+                cursor = m.end()
+                fixes.append("Added missing 'return' keyword")
+
+        if parts:
+            parts.append(content[cursor:])
+            content = b''.join(parts)
+
         if fixes:
             self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-            return '\n'.join(new_lines)
-        
+
         return content
     
     def fix_malformed_try_catch_blocks(self, content, file_path):
         """Fix malformed try-catch block structures"""
+        # Files without a catch can't need any of the fixes below
+        if b'catch' not in content:
+            return content
+
         fixes = []
-        lines = content.split('\n')
-        new_lines = []
+        lines = content.split(b'\n')
+        # len() is invariant across the walk (lines are edited in place,
+        # never added), so evaluate it once instead of per iteration. The
+        # walk emits exactly one output line per input line, so the output
+        # list can be pre-sized and filled by index - no append resizing
+        n = len(lines)
+        new_lines = [None] * n
+        # Lazy brace prefix sums: cum_open[x]/cum_close[x] count braces in
+        # lines[:x], so the balance over lines[j:i] is two O(1) subtractions
+        # instead of two count() scans per line of the backward walk. Built
+        # on first use and invalidated when a line is edited in place.
+        cum_open = cum_close = None
         i = 0
-        
-        while i < len(lines):
+
+        while i < n:
             line = lines[i]
-            
+
             # Look for orphaned catch blocks
-            if re.match(r'\s*\}\s*catch\s*\(\s*error\s*\)\s*\{', line.strip()):
+            if _RE_CATCH.match(line.strip()):
+                if cum_open is None:
+                    cum_open = [0] + list(accumulate(l.count(b'{') for l in lines))
+                    cum_close = [0] + list(accumulate(l.count(b'}') for l in lines))
+
                 # Find the corresponding try block above
                 try_found = False
                 j = i - 1
-                brace_count = 0
-                
+
                 while j >= 0:
-                    if '{' in lines[j]:
-                        brace_count += lines[j].count('{')
-                    if '}' in lines[j]:
-                        brace_count -= lines[j].count('}')
-                    
-                    if 'try {' in lines[j]:
+                    l = lines[j]
+
+                    if b'try {' in l:
                         try_found = True
                         break
-                    
-                    # If we find a function declaration, insert try block
-                    if ('async function' in lines[j] or 'export async function' in lines[j]) and brace_count == 0:
+
+                    # If we find a function declaration with balanced braces
+                    # between it and the catch, insert try block
+                    if ((b'async function' in l or b'export async function' in l)
+                            and (cum_open[i] - cum_open[j]) == (cum_close[i] - cum_close[j])):
                         # Insert try block after the function declaration
                         for k in range(j + 1, i):
-                            if '{' in lines[k] and 'try' not in lines[k]:
-                                lines[k] = lines[k].replace('{', '{\n  try {')
+                            if b'{' in lines[k] and b'try' not in lines[k]:
+                                lines[k] = lines[k].replace(b'{', b'{\n  try {')
+                                cum_open = cum_close = None
                                 try_found = True
                                 fixes.append(f"Added missing try block after function at line {k+1}")
                                 break
                         break
                     j -= 1
-                
+
                 # Convert } catch to } } catch
                 if try_found:
-                    line = line.replace('} catch', '  } catch')
-            
-            new_lines.append(line)
+                    line = line.replace(b'} catch', b'  } catch')
+
+            new_lines[i] = line
             i += 1
-        
-        if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-            return '\n'.join(new_lines)
-        
-        return content
-    
-    def fix_missing_return_keyword(self, content, file_path):
-        """Add missing 'return' keywords to response statements"""
-        fixes = []
-        
-        # Pattern: NextResponse.json without return
-        pattern = r'^(\s+)NextResponse\.json\('
-        def add_return(match):
-            indent = match.group(1)
-            fixes.append("Added missing 'return' keyword")
-            return f"{indent}return NextResponse.json("
-        
-        content = re.sub(pattern, add_return, content, flags=re.MULTILINE)
-        
+
         if fixes:
             self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-        
+            return b'\n'.join(new_lines)
+
         return content
     
     def fix_missing_closing_braces(self, content, file_path):
         """Fix missing closing braces for functions"""
-        fixes = []
-        lines = content.split('\n')
-        
-        # Count braces to see if we need closing braces
-        open_braces = 0
-        for line in lines:
-            open_braces += line.count('{')
-            open_braces -= line.count('}')
-        
+        # Two count calls over the whole buffer - no split into lines,
+        # no per-line Python loop, no rejoin
+        open_braces = content.count(b'{') - content.count(b'}')
+
         # Add missing closing braces if needed
         if open_braces > 0:
-            for _ in range(open_braces):
-                lines.append('}')
-            fixes.append(f"Added {open_braces} missing closing braces")
-        
-        if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
-        
-        return '\n'.join(lines)
+            content += b'\n}' * open_braces
+            self.fixes_applied.append({
+                "file": str(file_path),
+                "fixes": [f"Added {open_braces} missing closing braces"]
+            })
+
+        return content
     
     def fix_file(self, file_path):
         """Apply all targeted fixes to a single file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
+            p = Path(file_path)
+            content = p.read_bytes()
+
+            # Skip all regex work when the content already matches what the
+            # last run produced for this file
+            h = _content_hash(content)
+            if _load_hash_cache().get(str(file_path)) == h:
+                print(f"⚪ Unchanged since last run (cache hit): {file_path}")
+                return False
+
             original_content = content
-            
+
             # Apply fixes in order
             content = self.fix_broken_return_statements(content, file_path)
-            content = self.fix_missing_return_keyword(content, file_path)
             content = self.fix_malformed_try_catch_blocks(content, file_path)
             content = self.fix_missing_closing_braces(content, file_path)
-            
+
             # Only write if changes were made
             if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                p.write_bytes(content)
+                self.content_hashes[str(file_path)] = _content_hash(content)
                 print(f"✅ Fixed: {file_path}")
                 return True
             else:
+                self.content_hashes[str(file_path)] = h
                 print(f"⚪ No changes needed: {file_path}")
                 return False
         
@@ -188,12 +277,28 @@ class TargetedSyntaxFixer:
     
     def fix_all_files(self, file_list):
         """Fix specific list of files with known errors"""
+        # Each file is independent, so fan out across cores; chunksize=1
+        # because every task is a heavy multi-pass fix
         fixed_count = 0
-        
-        for file_path in file_list:
-            if self.fix_file(file_path):
-                fixed_count += 1
-        
+        new_hashes = {}
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            for changed, fixes, hashes in executor.map(_fix_file_worker, file_list, chunksize=1):
+                if changed:
+                    fixed_count += 1
+                self.fixes_applied.extend(fixes)
+                new_hashes.update(hashes)
+
+        # Persist the post-fix hashes once, in the parent, so the workers
+        # never race on the cache file
+        if new_hashes:
+            cache = dict(_load_hash_cache())
+            cache.update(new_hashes)
+            try:
+                with open(_CACHE_PATH, 'w') as f:
+                    json.dump(cache, f)
+            except OSError as e:
+                print(f"⚠️  Could not save hash cache: {e}")
+
         print(f"Fixed {fixed_count} files out of {len(file_list)}")
 
 # Known problematic files from TypeScript output
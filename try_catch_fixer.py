@@ -4,26 +4,64 @@ Precise Try-Catch Block Fixer
 Specifically fixes missing try blocks before existing catch blocks
 """
 
+import collections
+import json
+import os
 import re
 from pathlib import Path
 
+# Precompiled patterns - parsed once per run instead of per line/call
+_RE_CATCH = re.compile(r'^\s*\}\s*catch\s*\(\s*error\s*\)\s*\{')
+_RE_BARE_CATCH = re.compile(r'^\s*catch\s*\(\s*error\s*\)\s*\{')
+# One pattern covers both the shorthand ({ applications, stats }) and the
+# key-value ({ escrow: escrowInfo }) shapes - the old second pattern only
+# matched a subset of the first, so running both just rescanned the buffer
+_RE_RETURN_MISSING_SEMI = re.compile(r'(\s+return\s+NextResponse\.json\(\s*\{[^}]*\}\s*\))\s*\n(\s*\}\s*catch)', re.MULTILINE)
+
 class TryCatchFixer:
     def __init__(self, base_path):
         self.base_path = Path(base_path)
-        self.fixes_applied = []
+        # path -> accumulated fix messages; one bucket per file instead of a
+        # short-lived {"file", "fixes"} dict per fix method call. The report
+        # shape is materialized once at serialization time in main().
+        self.fixes_applied = collections.defaultdict(list)
+        # path -> mtime recorded after the last run; a stat against this map
+        # shortcuts the read and both fix passes for untouched files
+        self._mtime_path = self.base_path / '.syntax_fixer_mtimes.json'
+        try:
+            with open(self._mtime_path, 'r') as f:
+                self.mtimes = json.load(f)
+        except (OSError, ValueError):
+            self.mtimes = {}
+
+    def save_mtimes(self):
+        """Persist the post-fix mtimes so the next run can skip clean files."""
+        try:
+            with open(self._mtime_path, 'w') as f:
+                json.dump(self.mtimes, f)
+        except OSError as e:
+            print(f"❌ Could not save mtime cache: {e}")
     
     def fix_missing_try_blocks(self, content, file_path):
         """Add missing try blocks before existing catch blocks"""
+        # Files without a catch can't need a try inserted
+        if 'catch' not in content:
+            return content
+
         fixes = []
         lines = content.split('\n')
         new_lines = []
-        
+        # Try-block insertions are deferred and applied after the scan; the
+        # old slice-and-concat rebuilt the whole accumulated list on every
+        # catch block, O(catches x lines) instead of one pass plus K inserts
+        pending_inserts = []
+
         i = 0
         while i < len(lines):
             line = lines[i]
             
             # Look for orphaned } catch (error) { patterns
-            if re.search(r'^\s*\}\s*catch\s*\(\s*error\s*\)\s*\{', line.strip()):
+            if _RE_CATCH.search(line.strip()):
                 # This catch block needs a try block
                 # Look backwards to find where the try should start
                 j = i - 1
@@ -63,10 +101,8 @@ class TryCatchFixer:
                     indent = len(indent_line) - len(indent_line.lstrip())
                     
                     # Insert the try block
-                    new_lines = new_lines[:try_insertion_point] + [
-                        ' ' * indent + 'try {'
-                    ] + new_lines[try_insertion_point:]
-                    
+                    pending_inserts.append((try_insertion_point, ' ' * indent + 'try {'))
+
                     # Adjust the catch line to have proper closing brace for try
                     line = line.replace('} catch', '  } catch')
                     
@@ -79,7 +115,7 @@ class TryCatchFixer:
                     fixes.append(f"Added fallback try block for catch at line {i+1}")
             
             # Look for lines that are just catch blocks without proper structure
-            elif re.search(r'^\s*catch\s*\(\s*error\s*\)\s*\{', line.strip()):
+            elif _RE_BARE_CATCH.search(line.strip()):
                 # This is a standalone catch - needs both closing brace for try and proper structure
                 indent = len(line) - len(line.lstrip())
                 new_lines.append(' ' * indent + '} catch (error) {')
@@ -91,50 +127,57 @@ class TryCatchFixer:
             i += 1
         
         if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
+            # Applying the deferred inserts in scan order reproduces the
+            # positions the in-loop insertions produced
+            for pos, try_line in pending_inserts:
+                new_lines.insert(pos, try_line)
+            self.fixes_applied[str(file_path)].extend(fixes)
             return '\n'.join(new_lines)
-        
+
         return content
-    
+
     def fix_malformed_return_statements(self, content, file_path):
         """Fix specific malformed return statement patterns"""
         fixes = []
-        
-        # Fix: return NextResponse.json({ applications, stats }) - missing semicolon
-        pattern = r'(\s+return\s+NextResponse\.json\(\s*\{\s*[^}]+\s*\}\s*\))\s*\n(\s*\}\s*catch)'
-        def add_semicolon(match):
-            return_part = match.group(1)
-            catch_part = match.group(2)
-            fixes.append("Added missing semicolon to return statement")
-            return f"{return_part};\n{catch_part}"
-        
-        content = re.sub(pattern, add_semicolon, content, flags=re.MULTILINE)
-        
-        # Fix: return NextResponse.json({ escrow: escrowInfo })
-        pattern2 = r'(\s+return\s+NextResponse\.json\(\s*\{\s*[^}]+:\s*[^}]+\s*\}\s*\))\s*\n(\s*\}\s*catch)'
-        content = re.sub(pattern2, add_semicolon, content, flags=re.MULTILINE)
+
+        # Fix: return NextResponse.json({ applications, stats }) or
+        # ({ escrow: escrowInfo }) - missing semicolon. A back-reference
+        # template keeps the substitution entirely in C; the old per-match
+        # Python callback existed only to splice the two groups back together.
+        content, n = _RE_RETURN_MISSING_SEMI.subn(r'\1;\n\2', content)
+        fixes.extend(["Added missing semicolon to return statement"] * n)
         
         if fixes:
-            self.fixes_applied.append({"file": str(file_path), "fixes": fixes})
+            self.fixes_applied[str(file_path)].extend(fixes)
         
         return content
     
     def fix_file(self, file_path):
         """Fix a single file"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
+            # mtime gate: a single stat against the recorded value skips the
+            # read and both fix passes when the file hasn't moved
+            key = str(file_path)
+            mtime = os.stat(file_path).st_mtime
+            if self.mtimes.get(key) == mtime:
+                return False
+
+            p = Path(file_path)
+            content = p.read_text(encoding='utf-8')
+
             original_content = content
-            
+
             # Apply fixes
             content = self.fix_missing_try_blocks(content, file_path)
             content = self.fix_malformed_return_statements(content, file_path)
-            
+
             if content != original_content:
-                with open(file_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                p.write_text(content, encoding='utf-8')
+                self.mtimes[key] = os.stat(file_path).st_mtime
                 return True
+            # A clean file is also in its fixed state - record it so the
+            # next run skips it too
+            self.mtimes[key] = mtime
             return False
         
         except Exception as e:
@@ -176,10 +219,14 @@ def main():
     print("-" * 60)
     print(f"Fixed {fixed_count} files")
     
-    # Save report
-    import json
+    fixer.save_mtimes()
+
+    # Save report - materialize the per-file buckets into the report shape
+    # once, here, instead of allocating a dict per fix call
+    report = [{"file": path, "fixes": fixes}
+              for path, fixes in fixer.fixes_applied.items()]
     with open(f"{base_path}/try_catch_fixes_report.json", 'w') as f:
-        json.dump(fixer.fixes_applied, f, indent=2)
+        json.dump(report, f, indent=2)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
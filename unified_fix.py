@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Unified TypeScript Syntax Fixer
+Applies the rules from fix_syntax_comprehensive, precise_typescript_fixer,
+quick_syntax_fix and simple_syntax_fix in a single pass: one tree walk, one
+read and at most one write per file, instead of four of each when the
+scripts are run back to back.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import fix_syntax_comprehensive as comprehensive
+from precise_typescript_fixer import _DOUBLED_RETURN_TOKEN, _collapse_doubled_returns
+from simple_syntax_fix import _RETURN_SEMI_CATCH, _STATUS_ONLY_LINE, _STATUS_SEMI
+from fixer_utils import dumps_report, iter_ts_files, read_text_mmap, write_atomic
+
+# Every template-substitution rule from the individual fixers, applied in
+# the order the scripts would have run. Each entry is
+# (substring gate, compiled pattern, replacement, fix name). The
+# doubled-return collapse is not a template rule - it needs the
+# line-adjacency checks in _collapse_doubled_returns - so fix_content runs
+# it separately.
+RULES = [
+    ('status:', _STATUS_SEMI, r'\1}',
+     "Fixed semicolon in status object"),
+    ('} catch', _RETURN_SEMI_CATCH, r'\1;\n\2',
+     "Added missing semicolon before catch block"),
+    ('status:', _STATUS_ONLY_LINE,
+     r'\1return NextResponse.json({ error: "Internal server error" }, { status: \2 });',
+     "Fixed incomplete return statement"),
+]
+
+def fix_content(content):
+    """Apply every rule to one in-memory buffer, returning (content, fixes)."""
+    fixes = []
+
+    # The fused alternation from fix_syntax_comprehensive
+    if 'return NextResponse.json' in content:
+        fired = set()
+        content = comprehensive._COMBINED.sub(
+            lambda m: comprehensive._combined_repl(m, fired), content)
+        fixes.extend(comprehensive._FIX_MESSAGES[key]
+                     for key in ('fn', 'catch', 'if', 'semi') if key in fired)
+
+    # The doubled-return collapse from precise_typescript_fixer
+    if _DOUBLED_RETURN_TOKEN in content:
+        content, doubled = _collapse_doubled_returns(content)
+        if doubled:
+            fixes.append("Fixed malformed return statement")
+
+    for gate, pattern, replacement, name in RULES:
+        if gate in content:
+            content, n = pattern.subn(replacement, content)
+            if n:
+                fixes.append(name)
+
+    # Balance trailing braces (the quick/comprehensive end-of-file rule)
+    if 'async function' in content:
+        missing = content.count('{') - content.count('}')
+        if missing > 0:
+            content += '\n' + '}\n' * missing
+            fixes.append(f"Added {missing} missing closing braces")
+
+    return content, fixes
+
+def fix_file(file_path):
+    """Read, fix and (only if changed) rewrite one file."""
+    try:
+        content = read_text_mmap(file_path)
+        fixed, fixes = fix_content(content)
+        if fixed != content:
+            write_atomic(file_path, fixed)
+            print(f"✅ Fixed: {file_path}")
+            return True, [{"file": file_path, "fixes": fixes}]
+        print(f"⚪ No changes needed: {file_path}")
+        return False, []
+    except Exception as e:
+        print(f"❌ Error fixing {file_path}: {e}")
+        return False, []
+
+def main():
+    base_path = "/project/workspace/alphaeth784/taskfi-dan"
+    api_path = os.path.join(base_path, "src", "app", "api")
+
+    ts_files = list(iter_ts_files(api_path))
+    print(f"Applying unified fixes to {len(ts_files)} TypeScript files...")
+    print("-" * 60)
+
+    fixes_applied = []
+    fixed_count = 0
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        for changed, fixes in executor.map(fix_file, ts_files, chunksize=8):
+            if changed:
+                fixed_count += 1
+            fixes_applied.extend(fixes)
+
+    print("-" * 60)
+    print(f"Fixed {fixed_count} files out of {len(ts_files)}")
+
+    report_path = os.path.join(base_path, "unified_fixes_report.json")
+    with open(report_path, 'wb') as f:
+        f.write(dumps_report(fixes_applied))
+    print("Fix report saved to: unified_fixes_report.json")
+
+if __name__ == "__main__":
+    main()